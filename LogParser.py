@@ -5,145 +5,337 @@ ADIF Log File Parser - GUI Version
 Parses ADIF log files and filters records based on LOTW_QSL_RCVD and QSL_RCVD status
 """
 
+import mmap
+import multiprocessing
 import os
 import re
+import sys
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from typing import List, Dict, Optional
+from typing import Iterator, List, Optional
+from dataclasses import dataclass, field
+from html import escape
 import tempfile
 import webbrowser
 import datetime
+from operator import attrgetter
+
+# Precompiled end-of-record pattern - compiling once at import avoids the
+# per-call pattern cache lookup inside re when parsing thousands of records.
+# Bytes pattern so it can run directly over an mmap'd file
+_EOR_RE = re.compile(rb'<eor>', re.IGNORECASE)
+
+# Canonical band ordering (approximate wavelength in meters), keyed by
+# lowercase band label - a single dict lookup per sort key instead of
+# re-deriving the number from the label on every comparison
+_BAND_ORDER = {
+    '2190m': 2190, '630m': 630, '160m': 160, '80m': 80, '60m': 60,
+    '40m': 40, '30m': 30, '20m': 20, '17m': 17, '15m': 15, '12m': 12,
+    '10m': 10, '6m': 6, '4m': 4, '2m': 2, '1.25m': 1.25,
+    '70cm': 0.7, '33cm': 0.33, '23cm': 0.23, '13cm': 0.13,
+}
+
+# C-level display-row builder - one call instead of nine attribute reads
+_ROW_GETTER = attrgetter('CALL', 'BAND', 'DXCC', 'COUNTRY', 'MODE', 'FREQ',
+                         'LOTW_QSL_SENT', 'LOTW_QSL_RCVD', 'QSL_RCVD')
+
+# Column headers and fixed widths for the text export - the header line,
+# row format and separator all derive from this one spec
+_EXPORT_COLUMNS = (('CALL', 12), ('BAND', 8), ('DXCC', 6), ('COUNTRY', 20),
+                   ('MODE', 8), ('FREQ', 10), ('LOTW-SENT', 10),
+                   ('LOTW-RCVD', 10), ('QSL-RCVD', 10))
+_EXPORT_ROW_FMT = ' '.join(f'{{:<{width}}}' for _, width in _EXPORT_COLUMNS) + '\n'
+_EXPORT_WIDTH = sum(width for _, width in _EXPORT_COLUMNS) + len(_EXPORT_COLUMNS) - 1
+
+
+@dataclass(slots=True)
+class QSO:
+    """One parsed QSO record, holding only the fields this tool uses -
+    a slotted object is about a third the size of the dict per record"""
+    CALL: str = ''
+    BAND: str = ''
+    DXCC: str = ''
+    COUNTRY: str = ''
+    MODE: str = ''
+    FREQ: str = ''
+    LOTW_QSL_SENT: str = ''
+    LOTW_QSL_RCVD: str = 'N'
+    QSL_RCVD: str = 'N'
+    # Derived once at parse time so the filters don't recompute them
+    confirmed: bool = False
+    band_lc: str = ''
+    # Rendered HTML report row, built lazily on first print and reused -
+    # field values never change after parsing
+    row_html: Optional[str] = field(default=None, repr=False, compare=False)
+
+
+# ADIF field names stored on QSO records; everything else is ignored
+_QSO_FIELDS = frozenset((
+    'CALL', 'BAND', 'DXCC', 'COUNTRY', 'MODE', 'FREQ',
+    'LOTW_QSL_SENT', 'LOTW_QSL_RCVD', 'QSL_RCVD',
+))
+
+# The kept field names as raw bytes, so tags can be rejected before any
+# decoding happens - logbook exports carry 40+ fields per record and the
+# ignored ones (GRIDSQUARE, RST_SENT, COMMENT, ...) now cost nothing but
+# the scan past their value
+_KEEP = frozenset(name.encode('ascii') for name in _QSO_FIELDS)
+
+# Narrow-cardinality fields whose values recur across most records ('Y',
+# '20m', 'FT8', country names, ...) - interning collapses the duplicate
+# strings to one object each
+_INTERN_FIELDS = frozenset((
+    'BAND', 'MODE', 'DXCC', 'COUNTRY',
+    'LOTW_QSL_SENT', 'LOTW_QSL_RCVD', 'QSL_RCVD',
+))
+
+
+def _band_order_value(band: str) -> float:
+    """Ordering value for a band label missing from _BAND_ORDER - derive
+    the wavelength from the unit suffix rather than guessing, so rare
+    bands (6cm, 3400m, ...) still land in their proper place"""
+    try:
+        if band.endswith('cm'):
+            return float(band[:-2]) / 100
+        if band.endswith('m'):
+            return float(band[:-1])
+    except ValueError:
+        pass
+    return -1  # Unknown labels go to the end of the reversed sort
+
+
+def _parse_chunk(chunk: bytes) -> List[QSO]:
+    """Parse one <eor>-aligned slice of an ADIF file; the worker for
+    parallel parsing of large files"""
+    parser = ADIFLogParser()
+    records = parser.records
+    pos = 0
+    # Records are delimited by <eor> (case-insensitive, some loggers
+    # write <EOR>)
+    for match in _EOR_RE.finditer(chunk):
+        record = parser.parse_record(chunk[pos:match.start()])
+        if record:
+            records.append(record)
+        pos = match.end()
+    # Trailing text after the last <eor> (or a chunk with none)
+    record = parser.parse_record(chunk[pos:])
+    if record:
+        records.append(record)
+    return records
 
 
 class ADIFLogParser:
+    # Files at least this big are split at <eor> boundaries and parsed by
+    # a process pool; below it the pool overhead isn't worth it
+    _PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
     def __init__(self):
         self.records = []
+        # Lazily built caches reused across filter invocations; invalidated
+        # whenever a new file is parsed
+        self._confirmed_band_dxcc = None
+        self._confirmed_countries = None
     
     def parse_file(self, file_path: str) -> bool:
         """Parse the ADIF log file and extract records"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            # Split records by <eor> (end of record)
-            record_texts = content.split('<eor>')
-            
             self.records = []
-            for record_text in record_texts:
-                if record_text.strip():  # Skip empty records
-                    record = self.parse_record(record_text)
-                    if record:
-                        self.records.append(record)
-            
+            self._confirmed_band_dxcc = None
+            self._confirmed_countries = None
+
+            size = os.path.getsize(file_path)
+            workers = os.cpu_count() or 1
+            if size >= self._PARALLEL_MIN_BYTES and workers > 1:
+                with open(file_path, 'rb') as file:
+                    with mmap.mmap(file.fileno(), 0,
+                                   access=mmap.ACCESS_READ) as mm:
+                        self._parse_parallel(mm, size, workers)
+            else:
+                self.records = list(self.iter_records(file_path))
+
             return True
             
         except Exception as e:
             raise Exception(f"Error reading file: {e}")
-    
-    def parse_record(self, record_text: str) -> Optional[Dict[str, str]]:
+
+    def iter_records(self, file_path: str) -> Iterator[QSO]:
+        """Yield records from an ADIF file one at a time - streaming
+        consumers get each record as it is parsed without the full list
+        that parse_file materializes"""
+        with open(file_path, 'rb') as file:
+            if os.path.getsize(file_path) == 0:
+                return
+
+            # mmap the file instead of reading it into one giant string -
+            # record slices are decoded one at a time, so the whole file is
+            # never duplicated in memory
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                pos = 0
+                # Records are delimited by <eor> (case-insensitive, some
+                # loggers write <EOR>)
+                for match in _EOR_RE.finditer(mm):
+                    record = self.parse_record(mm[pos:match.start()])
+                    if record:
+                        yield record
+                    pos = match.end()
+                # Trailing text after the last <eor> (or a file with none)
+                record = self.parse_record(mm[pos:])
+                if record:
+                    yield record
+
+    def _parse_parallel(self, mm, size: int, workers: int) -> None:
+        """Split the mapped file at <eor> boundaries into one chunk per
+        worker and parse the chunks in a process pool"""
+        chunks = []
+        start = 0
+        target = size // workers
+        for k in range(1, workers):
+            match = _EOR_RE.search(mm, max(start, k * target))
+            if not match:
+                break
+            chunks.append(mm[start:match.end()])
+            start = match.end()
+        chunks.append(mm[start:])
+
+        with multiprocessing.Pool(min(workers, len(chunks))) as pool:
+            for records in pool.map(_parse_chunk, chunks):
+                self.records.extend(records)
+
+    def parse_record(self, record_text: bytes) -> Optional[QSO]:
         """Parse a single ADIF record and extract field values"""
-        record = {}
-        
+        record = QSO()
+
         # ADIF format: <field:length>value
-        # Find all ADIF fields using regex
-        field_pattern = r'<([^>:]+)(?::(\d+))?(?::[^>]*)?>\s*([^<]*)'
-        matches = re.findall(field_pattern, record_text, re.IGNORECASE)
-        
-        for match in matches:
-            field_name = match[0].upper()
-            field_length = match[1]
-            field_value = match[2].strip()
-            
-            # If length is specified, use only that many characters
-            if field_length and field_length.isdigit():
-                field_value = field_value[:int(field_length)]
-            
-            record[field_name] = field_value
+        # Scan the raw bytes with find instead of decoding the record to a
+        # str first - ADIF is ASCII apart from field values, so only the
+        # values that are actually kept get decoded. Field lengths count
+        # bytes, so slicing before decoding is also what the spec means
+        i = record_text.find(b'<')
+        while i != -1:
+            j = record_text.find(b'>', i + 1)
+            if j == -1:
+                break
+            tag = record_text[i + 1:j]
+            colon = tag.find(b':')
+            if colon == -1:
+                # Tag without a length (<eoh>, <eor>) carries no value
+                i = record_text.find(b'<', j + 1)
+                continue
+            name_bytes = tag[:colon].upper()
+            length_part = tag[colon + 1:]
+            # Strip an optional type suffix (<field:length:type>)
+            type_colon = length_part.find(b':')
+            if type_colon != -1:
+                length_part = length_part[:type_colon]
+            try:
+                field_length = int(length_part)
+            except ValueError:
+                i = record_text.find(b'<', j + 1)
+                continue
+            value_end = j + 1 + field_length
+            if name_bytes in _KEEP:
+                field_name = sys.intern(name_bytes.decode('ascii'))
+                value = record_text[j + 1:value_end].decode('utf-8', 'replace')
+                if field_name in _INTERN_FIELDS:
+                    value = sys.intern(value)
+                setattr(record, field_name, value)
+            i = record_text.find(b'<', value_end)
         
         # Only return record if it has essential fields
-        if record.get('CALL'):
+        if record.CALL:
+            record.confirmed = (record.LOTW_QSL_RCVD == 'Y'
+                                or record.QSL_RCVD == 'Y')
+            record.band_lc = sys.intern(record.BAND.lower())
             return record
         return None
-    
-    def is_record_confirmed(self, record: Dict[str, str]) -> bool:
+
+    def is_record_confirmed(self, record: QSO) -> bool:
         """Check if a record is confirmed by either LoTW or paper QSL"""
-        lotw_rcvd = record.get('LOTW_QSL_RCVD', 'N')
-        qsl_rcvd = record.get('QSL_RCVD', 'N')
-        return lotw_rcvd == 'Y' or qsl_rcvd == 'Y'
+        return record.confirmed
     
-    def sort_records_by_band(self, records: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    def sort_records_by_band(self, records: List[QSO]) -> List[QSO]:
         """Sort records by band in proper numerical order"""
         def band_sort_key(record):
-            band = record.get('BAND', '').lower()
-            # Extract numeric part from band (e.g., "20m" -> 20, "6m" -> 6)
-            try:
-                if 'm' in band:
-                    return int(band.replace('m', ''))
-                elif 'cm' in band:
-                    return int(band.replace('cm', '')) / 100  # Convert cm to m equivalent
-                else:
-                    return 999  # Put unknown bands at the end
-            except ValueError:
-                return 999  # Put invalid bands at the end
-        
+            band = record.band_lc
+            value = _BAND_ORDER.get(band)
+            if value is None:
+                # Derive once and memoize so each unknown label pays the
+                # fallback only on first sight
+                value = _BAND_ORDER[band] = _band_order_value(band)
+            return value
+
         return sorted(records, key=band_sort_key, reverse=True)  # Reverse for 80, 40, 30, 20, 17, 15, 12, 6
     
-    def filter_records(self, filter_type: str = "confirmed", band_filter: str = "all") -> List[Dict[str, str]]:
+    def filter_records(self, filter_type: str = "confirmed", band_filter: str = "all") -> List[QSO]:
         """Filter records based on LOTW_QSL_RCVD and QSL_RCVD status and band"""
         filtered = []
-        
+
+        # Band check is applied inside each branch so every filter runs in a
+        # single pass over the records
+        band_lc = band_filter.lower()
+        apply_band = band_filter != "all"
+
         if filter_type == "confirmed":
             # Show only confirmed records (LoTW Y or paper QSL Y)
             for record in self.records:
-                if self.is_record_confirmed(record):
+                if record.confirmed:
+                    if apply_band and record.band_lc != band_lc:
+                        continue
                     filtered.append(record)
         elif filter_type == "confirmed_countries":
             # Show one record per confirmed country (DXCC)
-            # First apply band filter, then get unique DXCC entities
-            confirmed_records = []
+            # Deduplicate by DXCC in the same pass as the band filter, then
+            # sort only the unique entities - records of one DXCC share a
+            # COUNTRY, so deduplicating first picks the same representative
+            # as sorting first did
+            # The all-bands result is cached across filter clicks until the
+            # next parse
+            if not apply_band and self._confirmed_countries is not None:
+                return list(self._confirmed_countries)
+
+            seen_dxcc = set()
             for record in self.records:
-                if self.is_record_confirmed(record):
-                    # Apply band filter at this stage if specified
-                    if band_filter != "all":
-                        if record.get('BAND', '').lower() != band_filter.lower():
-                            continue
-                    confirmed_records.append(record)
-            
+                if record.confirmed:
+                    if apply_band and record.band_lc != band_lc:
+                        continue
+                    dxcc = record.DXCC
+                    if dxcc and dxcc not in seen_dxcc:
+                        seen_dxcc.add(dxcc)
+                        filtered.append(record)
+
             # Sort by COUNTRY name alphabetically
-            confirmed_records.sort(key=lambda x: x.get('COUNTRY', '').upper())
-            
-            # Get one record per DXCC
-            seen_dxcc = set()
-            for record in confirmed_records:
-                dxcc = record.get('DXCC', '')
-                if dxcc and dxcc not in seen_dxcc:
-                    seen_dxcc.add(dxcc)
-                    filtered.append(record)
-            
-            # Skip the general band filter later since we already applied it
-            return filtered
+            filtered.sort(key=lambda x: x.COUNTRY.upper())
+
+            if not apply_band:
+                self._confirmed_countries = list(filtered)
         elif filter_type == "unconfirmed":
             # Show only unconfirmed records (neither LoTW nor paper QSL confirmed)
             for record in self.records:
-                if not self.is_record_confirmed(record):
+                if not record.confirmed:
+                    if apply_band and record.band_lc != band_lc:
+                        continue
                     filtered.append(record)
         elif filter_type == "unconfirmed_no_qsl":
             # Show only unconfirmed records for DXCC entities that have no confirmed QSOs within the same band
             
-            # First, build a set of (BAND, DXCC) combinations that have confirmed QSOs
-            confirmed_band_dxcc = set()
-            for record in self.records:
-                if self.is_record_confirmed(record):
-                    band = record.get('BAND', '')
-                    dxcc = record.get('DXCC', '')
-                    if band and dxcc:
-                        confirmed_band_dxcc.add((band, dxcc))
+            # First, build a set of (BAND, DXCC) combinations that have
+            # confirmed QSOs - band-independent, so it is built once and
+            # reused across filter clicks until the next parse
+            if self._confirmed_band_dxcc is None:
+                self._confirmed_band_dxcc = {
+                    (record.BAND, record.DXCC)
+                    for record in self.records
+                    if record.confirmed and record.BAND and record.DXCC
+                }
+            confirmed_band_dxcc = self._confirmed_band_dxcc
             
             # Then filter unconfirmed records, excluding those where the same BAND+DXCC has a confirmed QSO
             for record in self.records:
-                if not self.is_record_confirmed(record):
-                    band = record.get('BAND', '')
-                    dxcc = record.get('DXCC', '')
+                if not record.confirmed:
+                    if apply_band and record.band_lc != band_lc:
+                        continue
+                    band = record.BAND
+                    dxcc = record.DXCC
                     if band and dxcc:
                         # Only include if this BAND+DXCC combination has no confirmed QSOs
                         if (band, dxcc) not in confirmed_band_dxcc:
@@ -152,23 +344,30 @@ class ADIFLogParser:
                         # Include records with missing BAND or DXCC data
                         filtered.append(record)
         else:  # "all"
-            filtered = self.records.copy()
-        
-        # Apply band filter (skip if already applied for confirmed_countries)
-        if band_filter != "all" and filter_type != "confirmed_countries":
-            filtered = [record for record in filtered if record.get('BAND', '').lower() == band_filter.lower()]
-        
+            if apply_band:
+                filtered = [record for record in self.records
+                            if record.band_lc == band_lc]
+            else:
+                filtered = self.records.copy()
+
         return filtered
 
 
 class ADIFLogGUI:
+    # Number of Treeview rows inserted per batch - each insert is a Tcl
+    # call, so rows beyond the first page are only loaded on scroll
+    _PAGE_SIZE = 500
+
     def __init__(self, root):
         self.root = root
         self.root.title("ADIF Log Parser")
         self.root.geometry("1000x700")
         self.parser = ADIFLogParser()
         self.current_file = None
-        
+        self._display_rows = []
+        self._last_filtered = []
+        self._rows_loaded = 0
+
         self.setup_ui()
     
     def setup_ui(self):
@@ -292,12 +491,13 @@ class ADIFLogGUI:
         self.tree.column('LOTW-RCVD', width=80)
         self.tree.column('QSL-RCVD', width=80)
         
-        # Scrollbar for treeview
-        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        
+        # Scrollbar for treeview - scroll updates go through _on_tree_scroll
+        # so more rows can be loaded as the view nears the bottom
+        self.scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
+
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         
         # Status bar
         self.status_var = tk.StringVar()
@@ -348,21 +548,13 @@ class ADIFLogGUI:
         if filter_type != "confirmed_countries":
             records = self.parser.sort_records_by_band(records)
         
-        # Populate treeview - Updated to include QSL_RCVD field
-        for record in records:
-            values = (
-                record.get('CALL', ''),
-                record.get('BAND', ''),
-                record.get('DXCC', ''),
-                record.get('COUNTRY', ''),
-                record.get('MODE', ''),
-                record.get('FREQ', ''),
-                record.get('LOTW_QSL_SENT', ''),
-                record.get('LOTW_QSL_RCVD', 'N'),
-                record.get('QSL_RCVD', 'N')
-            )
-            self.tree.insert('', 'end', values=values)
-        
+        # Buffer display rows Python-side and insert only the first page -
+        # populating the whole Treeview up front froze the UI on large logs
+        self._last_filtered = records
+        self._display_rows = list(map(_ROW_GETTER, records))
+        self._rows_loaded = 0
+        self._load_more_rows()
+
         # Update status
         filter_names = {
             "confirmed": "confirmed", 
@@ -377,10 +569,26 @@ class ADIFLogGUI:
         band_text = f" on {band_filter}" if band_filter != "all" else ""
         
         self.status_var.set(f"Showing {len(records)} {filter_name} records{band_text}")
-    
+
+    def _on_tree_scroll(self, first, last):
+        """Forward tree scroll state to the scrollbar, loading another page
+        of rows when the view nears the bottom"""
+        if float(last) > 0.9 and self._rows_loaded < len(self._display_rows):
+            self._load_more_rows()
+        self.scrollbar.set(first, last)
+
+    def _load_more_rows(self):
+        """Insert the next page of buffered rows into the tree"""
+        start = self._rows_loaded
+        end = min(start + self._PAGE_SIZE, len(self._display_rows))
+        insert = self.tree.insert
+        for row in self._display_rows[start:end]:
+            insert('', 'end', values=row)
+        self._rows_loaded = end
+
     def print_results(self):
         """Print filtered results by opening in browser print dialog"""
-        if not self.tree.get_children():
+        if not self._display_rows:
             messagebox.showwarning("Warning", "No results to print")
             return
         
@@ -488,19 +696,26 @@ class ADIFLogGUI:
                 <tbody>
         """
         
-        # Add table rows
-        for item in self.tree.get_children():
-            values = self.tree.item(item, 'values')
-            html += "<tr>"
-            for value in values:
-                html += f"<td>{value}</td>"
-            html += "</tr>"
-        
+        # Add table rows - built with join rather than += concatenation,
+        # which goes quadratic in the emitted size for large tables. Each
+        # row is escaped once and cached on its record, so re-printing the
+        # same data reuses the rendered HTML
+        rows = []
+        append = rows.append
+        for record in self._last_filtered:
+            row_html = record.row_html
+            if row_html is None:
+                cells = ''.join(f'<td>{escape(value)}</td>'
+                                for value in _ROW_GETTER(record))
+                row_html = record.row_html = f"<tr>{cells}</tr>"
+            append(row_html)
+        html += ''.join(rows)
+
         html += f"""
                 </tbody>
             </table>
             <div class="summary">
-                Total records: {len(self.tree.get_children())}
+                Total records: {len(self._display_rows)}
             </div>
         </body>
         </html>
@@ -510,7 +725,7 @@ class ADIFLogGUI:
     
     def export_results(self):
         """Export filtered results to a text file"""
-        if not self.tree.get_children():
+        if not self._display_rows:
             messagebox.showwarning("Warning", "No results to export")
             return
         
@@ -522,17 +737,20 @@ class ADIFLogGUI:
         
         if file_path:
             try:
-                with open(file_path, 'w') as f:
+                # One precomputed row format fed to writelines through a big
+                # buffer, instead of an f-string evaluation and small write
+                # per row
+                fmt = _EXPORT_ROW_FMT.format
+                with open(file_path, 'w', buffering=1 << 20) as f:
                     # Write header - Updated column headers
-                    f.write(f"{'CALL':<12} {'BAND':<8} {'DXCC':<6} {'COUNTRY':<20} {'MODE':<8} {'FREQ':<10} {'LOTW-SENT':<10} {'LOTW-RCVD':<10} {'QSL-RCVD':<10}\n")
-                    f.write("-" * 106 + "\n")
-                    
-                    # Write records
-                    for item in self.tree.get_children():
-                        values = self.tree.item(item, 'values')
-                        f.write(f"{values[0]:<12} {values[1]:<8} {values[2]:<6} {values[3]:<20} {values[4]:<8} {values[5]:<10} {values[6]:<10} {values[7]:<10} {values[8]:<10}\n")
-                    
-                    f.write(f"\nTotal records: {len(self.tree.get_children())}\n")
+                    f.write(fmt(*(name for name, _ in _EXPORT_COLUMNS)))
+                    f.write("-" * _EXPORT_WIDTH + "\n")
+
+                    # Write records from the Python-side buffer - no Tcl
+                    # round-trip per row
+                    f.writelines(fmt(*values) for values in self._display_rows)
+
+                    f.write(f"\nTotal records: {len(self._display_rows)}\n")
                 
                 messagebox.showinfo("Success", f"Results exported to {file_path}")
                 